@@ -6,11 +6,11 @@ from fastapi.responses import JSONResponse
 
 from config import settings
 from routers import documents, chat, tasks
-from services.gnn_service import gnn_service
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    gnn_service.initialize()
+    # The GNN model loads lazily on first prediction (see GNNService), so
+    # startup stays fast and /tasks-only workers never pay the torch load.
     yield
 
 app = FastAPI(
@@ -33,6 +33,23 @@ app.include_router(chat.router, prefix="/chat", tags=["chat"])
 app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
 
 
+def _assert_unique_routes(app: FastAPI) -> None:
+    """Fail fast at import if a (method, path) pair is registered twice.
+
+    Duplicate registrations (e.g. a router included twice) silently lengthen
+    Starlette's per-request route-matching scan; catch them at startup.
+    """
+    seen: set = set()
+    for route in app.router.routes:
+        for method in getattr(route, "methods", None) or ("*",):
+            key = (method, route.path)
+            assert key not in seen, f"Duplicate route registration: {method} {route.path}"
+            seen.add(key)
+
+
+_assert_unique_routes(app)
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     # This ensures that even on 500 errors, CORS headers are included
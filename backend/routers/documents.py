@@ -213,11 +213,11 @@ async def _run_ingestion_pipeline(
         # 1. Mark as processing
         service_db.table("documents").update({"ingest_status": "processing"}).eq("id", document_id).execute()
 
-        # 2. Download
-        file_bytes = storage_service.download(service_db, storage_path)
-
-        # 3. Extract pages
-        pages = pdf_service.extract_pages(file_bytes)
+        # 2-3. Stream the file into a spooled temp file (in-memory under
+        # 2 MB, disk beyond) and extract pages — large PDFs never need a
+        # full in-memory copy
+        with storage_service.download_stream(service_db, storage_path) as pdf_file:
+            pages = pdf_service.extract_pages(pdf_file)
 
         # 4. Chunk
         chunks = chunker.chunk_document(pages)
@@ -6,90 +6,100 @@ GET  /tasks/recommendations         – Returns forms + tasks based on user's qu
 POST /tasks/sync_from_questionnaire – Persist auto-generated tasks + form checklist from questionnaire
 """
 
+import asyncio
 from typing import Optional
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from supabase import Client
 
 from dependencies import get_current_user_id, get_user_supabase
+from services import catalog_cache
+from services.tax_rules import build_tasks, get_recommended_form_codes
 
-router = APIRouter()
+# orjson serializes the nested tasks/forms payloads considerably faster than
+# the default JSONResponse encoder
+router = APIRouter(default_response_class=ORJSONResponse)
 
-# ─── Mapping tables ───────────────────────────────────────────────────────────
+# Only the questionnaire columns the recommendation engine reads — the table
+# is wide (V2 added dozens of columns) and a star select shipped all of them
+_QUESTIONNAIRE_FIELDS = (
+    "id,residency_status,income_sources,visa_type,"
+    "states_worked,filing_status,num_dependents,filing_year"
+)
 
-# income_source value → form codes that apply
-INCOME_TO_FORMS: dict = {
-    "w2":          ["W-2"],
-    "1099_nec":    ["1099-NEC", "Schedule C"],
-    "1099_int":    ["1099-INT"],
-    "1099_div":    ["1099-DIV"],
-    "investments": ["1099-B", "Schedule D"],
-    "1098_t":      ["1098-T"],
-    "rental":      ["Schedule E"],
-}
 
-# Visa types that require Form 8843
-FORM_8843_VISAS = {"F-1", "F-2", "J-1", "J-2", "OPT", "STEM OPT"}
+@router.post("/admin/refresh-catalog")
+async def refresh_catalog_cache(user_id: str = Depends(get_current_user_id)):
+    """Invalidate the in-process reference-data cache after catalog edits."""
+    catalog_cache.invalidate()
+    return {"status": "cache_cleared"}
 
-# residency_status → primary return form
-RESIDENCY_TO_FORM: dict = {
-    "citizen":            "1040",
-    "permanent_resident": "1040",
-    "resident_alien":     "1040",
-    "nonresident_alien":  "1040-NR",
-    "dual_status":        "1040",   # also needs 1040-NR; add both
-    "unsure":             "1040",
-}
+# ─── Recommendations endpoint (read-only) ────────────────────────────────────
 
+def _ndjson_response(payload: dict) -> StreamingResponse:
+    """Stream each top-level section of the payload as one NDJSON line.
+
+    Lets the client start parsing/rendering the first section while the rest
+    is still on the wire — useful when the questionnaire echo is large.
+    """
+    async def gen():
+        for key, value in payload.items():
+            yield orjson.dumps({key: value}) + b"\n"
+
+    return StreamingResponse(gen(), media_type="application/x-ndjson")
 
-# ─── Recommendations endpoint (read-only) ────────────────────────────────────
 
 @router.get("/recommendations")
 async def get_task_recommendations(
     filing_year: int = 2024,
+    stream: bool = False,
     user_id: str = Depends(get_current_user_id),
     db: Client = Depends(get_user_supabase),
 ):
     """
     Build a personalized task list and form checklist from the user's questionnaire.
     Returns empty lists with a guidance message if no questionnaire exists yet.
+    Pass ?stream=true to receive the sections as NDJSON lines instead of one
+    JSON document.
     """
-    q_res = (
-        db.table("questionnaires")
-        .select("*")
-        .eq("user_id", user_id)
-        .eq("filing_year", filing_year)
-        .maybe_single()
-        .execute()
+    # One round-trip: the RPC (migration 019) returns the questionnaire
+    # projection and the recommended forms together, or NULL for new users —
+    # so the miss case is as cheap as the old HEAD presence probe. The sync
+    # client runs in the executor so the event loop keeps serving while the
+    # round-trip is in flight.
+    loop = asyncio.get_running_loop()
+    res = await loop.run_in_executor(
+        None,
+        lambda: db.rpc(
+            "get_recommendations_payload",
+            {"p_user": user_id, "p_year": filing_year},
+        ).execute(),
     )
 
-    if not q_res.data:
+    if not res.data:
         return {
             "tasks": [],
             "recommended_forms": [],
             "message": "Complete your profile to receive personalized recommendations.",
         }
 
-    q = q_res.data
-
-    # ── Recommended forms ─────────────────────────────────────────────────────
-    recommended_codes = _get_recommended_form_codes(q)
-    forms_res = (
-        db.table("forms_catalog")
-        .select("*")
-        .in_("form_code", list(recommended_codes))
-        .execute()
-    )
+    q = res.data["questionnaire"]
+    recommended_forms = res.data["recommended_forms"]
 
     # ── Recommended tasks ─────────────────────────────────────────────────────
-    tasks = _build_tasks(q)
+    tasks = build_tasks(q)
 
-    return {
-        "recommended_forms": forms_res.data or [],
+    payload = {
+        "recommended_forms": recommended_forms,
         "tasks": tasks,
         "questionnaire": q,
     }
+    if stream:
+        return _ndjson_response(payload)
+    return payload
 
 
 # ─── Sync endpoint (persists tasks + form checklist) ─────────────────────────
@@ -122,13 +132,21 @@ async def sync_tasks_from_questionnaire(
     """
     filing_year = payload.filing_year
 
-    q_res = (
-        db.table("questionnaires")
-        .select("*")
-        .eq("user_id", user_id)
-        .eq("filing_year", filing_year)
-        .maybe_single()
-        .execute()
+    # The questionnaire and task_groups reads have no data dependency on each
+    # other — run them concurrently (supabase-py is sync, hence the executor).
+    # Existing tasks are no longer read here: the sync RPC diffs server-side.
+    loop = asyncio.get_running_loop()
+    q_res, groups_by_name = await asyncio.gather(
+        loop.run_in_executor(
+            None,
+            lambda: db.table("questionnaires")
+            .select(_QUESTIONNAIRE_FIELDS)
+            .eq("user_id", user_id)
+            .eq("filing_year", filing_year)
+            .maybe_single()
+            .execute(),
+        ),
+        loop.run_in_executor(None, catalog_cache.get_task_groups, db),
     )
 
     if not q_res.data:
@@ -140,320 +158,80 @@ async def sync_tasks_from_questionnaire(
     q = q_res.data
 
     # Build recommended task payloads from questionnaire
-    recommended_tasks = _build_tasks(q)
+    recommended_tasks = build_tasks(q)
 
-    # Load task groups so we can map group name → id
-    groups_res = db.table("task_groups").select("*").execute()
-    groups_by_name = {g["name"]: g for g in (groups_res.data or [])}
-
-    # Ensure all referenced groups exist
+    # Ensure all referenced groups exist. "Missing" is judged against a TTL
+    # cache, so another worker may have inserted the group already — upsert
+    # on the name key instead of racing into a unique violation. The cache
+    # is dropped afterwards so later requests refetch the new groups.
     missing_groups = {t["group"] for t in recommended_tasks} - set(groups_by_name.keys())
     if missing_groups:
         insert_rows = [{"name": name, "sort_order": 99} for name in sorted(missing_groups)]
-        inserted = db.table("task_groups").insert(insert_rows).execute()
+        inserted = await loop.run_in_executor(
+            None,
+            lambda: db.table("task_groups").upsert(insert_rows, on_conflict="name").execute(),
+        )
         for g in inserted.data or []:
             groups_by_name[g["name"]] = g
+        catalog_cache.invalidate()
 
-    # Existing auto-generated tasks for this year/user (created from questionnaire)
-    existing_res = (
-        db.table("tasks")
-        .select("*")
-        .eq("user_id", user_id)
-        .eq("filing_year", filing_year)
-        .eq("source", "questionnaire")
-        .execute()
-    )
-    existing_tasks = existing_res.data or []
-
-    # Key existing tasks by (group_name, title)
-    group_id_to_name = {g["id"]: g["name"] for g in groups_by_name.values()}
-    existing_by_key: dict[tuple[str, str], dict] = {}
-    for t in existing_tasks:
-        g_name = group_id_to_name.get(t.get("task_group_id"))
-        if g_name:
-            existing_by_key[(g_name, t["title"])] = t
-
-    created = 0
-    updated = 0
-    kept_ids: set[str] = set()
-
-    # Upsert recommended tasks
+    # Rows for the sync RPC (migration 020): it upserts these on the
+    # migration-018 key, deletes the questionnaire tasks that are no longer
+    # recommended, and returns the created/updated/deleted counts — the whole
+    # diff happens server-side in one statement.
+    task_rows = []
     for idx, rec in enumerate(recommended_tasks):
-        group_name = rec["group"]
-        group = groups_by_name.get(group_name)
+        group = groups_by_name.get(rec["group"])
         if not group:
             continue
+        task_rows.append(
+            {
+                "task_group_id": group["id"],
+                "title": rec["title"],
+                "description": rec.get("description"),
+                "form_code": rec.get("form_code"),
+                "sort_order": idx,
+                "questionnaire_id": q["id"],
+            }
+        )
 
-        key = (group_name, rec["title"])
-        existing = existing_by_key.get(key)
-
-        if existing:
-            db.table("tasks").update(
-                {
-                    "description": rec.get("description"),
-                    "form_code": rec.get("form_code"),
-                    "sort_order": idx,
-                    "task_group_id": group["id"],
-                    "questionnaire_id": q["id"],
-                    "auto_generated": True,
-                    "source": "questionnaire",
-                }
-            ).eq("id", existing["id"]).execute()
-            updated += 1
-            kept_ids.add(existing["id"])
-        else:
-            db.table("tasks").insert(
-                {
-                    "user_id": user_id,
-                    "task_group_id": group["id"],
-                    "title": rec["title"],
-                    "description": rec.get("description"),
-                    "form_code": rec.get("form_code"),
-                    "status": "not_started",
-                    "filing_year": filing_year,
-                    "sort_order": idx,
-                    "questionnaire_id": q["id"],
-                    "auto_generated": True,
-                    "source": "questionnaire",
-                }
-            ).execute()
-            created += 1
-
-    # Delete any auto-generated tasks that are no longer recommended
-    obsolete_ids = [t["id"] for t in existing_tasks if t["id"] not in kept_ids]
-    deleted = 0
-    if obsolete_ids:
-        db.table("tasks").delete().in_("id", obsolete_ids).execute()
-        deleted = len(obsolete_ids)
-
-    # ── Refresh form checklist ────────────────────────────────────────────────
-    recommended_codes = _get_recommended_form_codes(q)
-
-    forms_res = (
-        db.table("forms_catalog")
-        .select("*")
-        .in_("form_code", list(recommended_codes))
-        .execute()
-    )
-    catalog_forms = forms_res.data or []
-
-    # Clear existing checklist for this user+year, then insert fresh
-    db.table("user_form_checklist") \
-        .delete() \
-        .eq("user_id", user_id) \
-        .eq("filing_year", filing_year) \
-        .execute()
+    # ── Form checklist rows ───────────────────────────────────────────────────
+    recommended_codes = get_recommended_form_codes(q)
 
+    # Resolve form_code → form_id from the cached catalog — no extra
+    # forms_catalog round-trip on the sync path once the cache is warm.
+    catalog_by_code = catalog_cache.get_forms_catalog(db)
     checklist_rows = [
-        {
-            "user_id": user_id,
-            "form_id": form["id"],
-            "filing_year": filing_year,
-            "status": "pending",
-        }
-        for form in catalog_forms
+        {"form_id": catalog_by_code[code]["id"], "status": "pending"}
+        for code in recommended_codes
+        if code in catalog_by_code
     ]
 
-    checklist_count = 0
-    if checklist_rows:
-        inserted = db.table("user_form_checklist").insert(checklist_rows).execute()
-        checklist_count = len(inserted.data or [])
-
-    return SyncTasksResponse(
-        created=created,
-        updated=updated,
-        deleted=deleted,
-        checklist_count=checklist_count,
+    # ── Write phase ───────────────────────────────────────────────────────────
+    # The task-sync RPC and the checklist refresh (both transactional
+    # server-side — migrations 020 and 015) touch disjoint tables, so the two
+    # calls run concurrently like the read phase above.
+    sync_res, checklist_res = await asyncio.gather(
+        loop.run_in_executor(
+            None,
+            lambda: db.rpc(
+                "sync_questionnaire_tasks",
+                {"p_user": user_id, "p_year": filing_year, "p_rows": task_rows},
+            ).execute(),
+        ),
+        loop.run_in_executor(
+            None,
+            lambda: db.rpc(
+                "refresh_form_checklist",
+                {"p_user": user_id, "p_year": filing_year, "p_checklist": checklist_rows},
+            ).execute(),
+        ),
     )
+    counts = sync_res.data or {}
 
-
-# ─── Shared helpers ──────────────────────────────────────────────────────────
-
-def _get_recommended_form_codes(q: dict) -> set:
-    """Build the set of recommended form codes from questionnaire data."""
-    recommended_codes: set = set()
-
-    # Primary return based on residency
-    primary_form = RESIDENCY_TO_FORM.get(q.get("residency_status", "unsure"), "1040")
-    recommended_codes.add(primary_form)
-    if q.get("residency_status") == "dual_status":
-        recommended_codes.add("1040-NR")
-
-    # Income-driven forms
-    for source in q.get("income_sources") or []:
-        recommended_codes.update(INCOME_TO_FORMS.get(source, []))
-
-    # Visa-driven forms
-    visa = q.get("visa_type", "")
-    if visa and visa in FORM_8843_VISAS:
-        recommended_codes.add("Form 8843")
-
-    return recommended_codes
-
-
-def _build_tasks(q: dict) -> list:
-    """Generate a recommended task list from questionnaire answers."""
-    tasks = []
-
-    # Personal group
-    tasks.append(
-        {
-            "group": "Personal",
-            "title": "Gather personal identification",
-            "description": "SSN or ITIN, passport/visa, prior year tax return",
-        }
-    )
-    tasks.append(
-        {
-            "group": "Personal",
-            "title": "Confirm your filing status",
-            "description": f"Currently set to: {q.get('filing_status', 'Not set')}",
-        }
+    return SyncTasksResponse(
+        created=int(counts.get("created", 0)),
+        updated=int(counts.get("updated", 0)),
+        deleted=int(counts.get("deleted", 0)),
+        checklist_count=int(checklist_res.data or 0),
     )
-
-    if q.get("num_dependents", 0) > 0:
-        tasks.append(
-            {
-                "group": "Personal",
-                "title": "Gather dependent information",
-                "description": f"{q['num_dependents']} dependent(s): SSN/ITIN, date of birth, relationship",
-            }
-        )
-
-    # Tax Forms group — one task per recommended form
-    income_sources = q.get("income_sources") or []
-
-    if "w2" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload W-2 (Wage and Tax Statement)",
-            "description": "Reports wages paid and taxes withheld by your employer",
-            "form_code": "W-2",
-        })
-
-    if "1099_nec" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload 1099-NEC (Nonemployee Compensation)",
-            "description": "Reports freelance/self-employment income",
-            "form_code": "1099-NEC",
-        })
-
-    if "1099_int" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload 1099-INT (Interest Income)",
-            "description": "Reports interest earned from bank accounts",
-            "form_code": "1099-INT",
-        })
-
-    if "1099_div" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload 1099-DIV (Dividends and Distributions)",
-            "description": "Reports dividends from investments",
-            "form_code": "1099-DIV",
-        })
-
-    if "investments" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload 1099-B (Broker Transactions)",
-            "description": "Reports stock/crypto sale proceeds",
-            "form_code": "1099-B",
-        })
-
-    if "1098_t" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload 1098-T (Tuition Statement)",
-            "description": "Reports tuition paid for education credits (American Opportunity or Lifetime Learning)",
-            "form_code": "1098-T",
-        })
-
-    if "rental" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Upload Schedule E (Rental Income)",
-            "description": "Reports rental income and losses",
-            "form_code": "Schedule E",
-        })
-
-    # Primary return form
-    residency = q.get("residency_status", "unsure")
-    primary_form = RESIDENCY_TO_FORM.get(residency, "1040")
-    if primary_form == "1040":
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Complete Form 1040 (US Individual Income Tax Return)",
-            "description": "Main federal tax return for residents/citizens",
-            "form_code": "1040",
-        })
-    elif primary_form == "1040-NR":
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Complete Form 1040-NR (Nonresident Alien Tax Return)",
-            "description": "Federal tax return for nonresident aliens",
-            "form_code": "1040-NR",
-        })
-
-    if residency == "dual_status":
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Complete Form 1040-NR (Dual Status — Nonresident portion)",
-            "description": "Required in addition to 1040 for dual-status filers",
-            "form_code": "1040-NR",
-        })
-
-    # Self-employment — Schedule C
-    if "1099_nec" in income_sources:
-        tasks.append({
-            "group": "Work Forms",
-            "title": "Track business expenses for Schedule C",
-            "description": "Home office, equipment, software, mileage — reduces self-employment tax",
-            "form_code": "Schedule C",
-        })
-
-    # Investments — Schedule D
-    if "investments" in income_sources:
-        tasks.append({
-            "group": "Tax Forms",
-            "title": "Complete Schedule D (Capital Gains and Losses)",
-            "description": "Summary of investment gains/losses",
-            "form_code": "Schedule D",
-        })
-
-    # Visa-specific
-    visa = q.get("visa_type", "")
-    if visa in FORM_8843_VISAS:
-        tasks.append(
-            {
-                "group": "Tax Forms",
-                "title": f"Prepare Form 8843 ({visa} visa)",
-                "description": "Required for exempt individuals — must be filed even with zero income",
-                "form_code": "Form 8843",
-            }
-        )
-
-    # Multi-state
-    states_worked = q.get("states_worked") or []
-    if len(states_worked) > 1:
-        tasks.append(
-            {
-                "group": "Other",
-                "title": f"File state returns for: {', '.join(states_worked)}",
-                "description": "You worked in multiple states — a separate state return may be required for each",
-            }
-        )
-
-    # Residency edge case
-    if q.get("residency_status") == "unsure":
-        tasks.append(
-            {
-                "group": "Personal",
-                "title": "Determine your tax residency status",
-                "description": "Apply the Substantial Presence Test to determine if you're a resident or nonresident alien",
-            }
-        )
-
-    return tasks
\ No newline at end of file
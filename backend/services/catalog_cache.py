@@ -0,0 +1,55 @@
+"""
+In-process cache for static reference data (task_groups, forms_catalog).
+
+Both tables change only on catalog edits, so every router that needs them can
+share these loaders instead of paying a Supabase round-trip per request.
+POST /tasks/admin/refresh-catalog calls invalidate() after catalog edits.
+"""
+
+import threading
+
+from cachetools import TTLCache
+from supabase import Client
+
+# cachetools caches are not thread-safe, and these loaders run on executor
+# threads while invalidate() runs on the event-loop thread — every cache
+# access goes through the lock. The Supabase fetch itself stays outside it.
+_ref_cache: TTLCache = TTLCache(maxsize=2, ttl=600)
+_ref_cache_lock = threading.Lock()
+
+
+def get_task_groups(db: Client) -> dict:
+    """Return task_groups keyed by name ({name: row}), cached in-process.
+
+    Callers get a shallow copy — mutating the returned mapping is request
+    state and must not leak into the shared cache entry.
+    """
+    with _ref_cache_lock:
+        groups = _ref_cache.get("task_groups")
+    if groups is None:
+        res = db.table("task_groups").select("id,name,sort_order").execute()
+        groups = {g["name"]: g for g in (res.data or [])}
+        with _ref_cache_lock:
+            _ref_cache["task_groups"] = groups
+    return dict(groups)
+
+
+def get_forms_catalog(db: Client) -> dict:
+    """Return forms_catalog keyed by form_code ({form_code: row}), cached in-process.
+
+    Returns a shallow copy; see get_task_groups.
+    """
+    with _ref_cache_lock:
+        catalog = _ref_cache.get("forms_catalog")
+    if catalog is None:
+        res = db.table("forms_catalog").select("id,form_code,display_name,description").execute()
+        catalog = {f["form_code"]: f for f in (res.data or [])}
+        with _ref_cache_lock:
+            _ref_cache["forms_catalog"] = catalog
+    return dict(catalog)
+
+
+def invalidate() -> None:
+    """Drop all cached reference data; next access refetches."""
+    with _ref_cache_lock:
+        _ref_cache.clear()
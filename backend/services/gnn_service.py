@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+import threading
 from pathlib import Path
 
 # Provide access to the GNN_models package dynamically
@@ -18,11 +19,14 @@ class GNNService:
         self.is_loaded = False
         self.model_path = str(MODEL_DIR / "models" / "checkpoints" / "gnn_v1.pt")
         self.device = "cuda" if os.environ.get("USE_GPU") == "1" else "cpu"
+        self._load_lock = threading.Lock()
+        self._load_attempted = False
 
     def initialize(self):
         """Load the model and encoders exactly once."""
-        if self.is_loaded:
+        if self.is_loaded or self._load_attempted:
             return
+        self._load_attempted = True
 
         if not Path(self.model_path).exists():
             logger.error(f"GNN checkpoint not found at {self.model_path}.")
@@ -41,8 +45,15 @@ class GNNService:
         Takes raw questionnaire data, formats it for the GNN, runs inference,
         and returns a string block designed to be injected into an LLM prompt.
         """
+        # Lazy, double-checked load on first use: workers that never hit a
+        # GNN endpoint skip the checkpoint load entirely, and concurrent first
+        # requests serialize on the lock instead of loading twice.
         if not self.is_loaded:
-            return ""
+            with self._load_lock:
+                if not self.is_loaded:
+                    self.initialize()
+            if not self.is_loaded:
+                return ""
 
         # Safely map Supabase fields to GNN expected schema
         gnn_input = {
@@ -3,8 +3,14 @@ Supabase Storage helpers for the ingestion pipeline.
 Uses the service-role client to download files (bypasses signed URL requirement).
 """
 
+from tempfile import SpooledTemporaryFile
+
+import httpx
 from supabase import Client
 
+# Files up to this size stay in memory; larger ones spill to disk
+_SPOOL_MAX_BYTES = 2 * 1024 * 1024
+
 
 def download(client: Client, storage_path: str, bucket: str = "tax-docs") -> bytes:
     """
@@ -22,3 +28,30 @@ def create_signed_url(client: Client, storage_path: str, expires_in: int = 3600,
     """
     response = client.storage.from_(bucket).create_signed_url(storage_path, expires_in)
     return response["signedURL"]
+
+
+def download_stream(
+    client: Client,
+    storage_path: str,
+    bucket: str = "tax-docs",
+) -> SpooledTemporaryFile:
+    """
+    Stream a file from Supabase Storage into a SpooledTemporaryFile.
+
+    Unlike download(), this never holds the whole file in memory: chunks are
+    written to a spooled temp file (in-memory up to 2 MB, disk beyond), which
+    is returned seeked to 0 and ready for pdf_service.extract_pages. The
+    caller is responsible for closing it (use as a context manager).
+    """
+    signed_url = create_signed_url(client, storage_path, expires_in=60, bucket=bucket)
+    tmp = SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+    try:
+        with httpx.stream("GET", signed_url) as response:
+            response.raise_for_status()
+            for chunk in response.iter_bytes():
+                tmp.write(chunk)
+    except BaseException:
+        tmp.close()
+        raise
+    tmp.seek(0)
+    return tmp
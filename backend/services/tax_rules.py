@@ -0,0 +1,293 @@
+"""
+Questionnaire → tax-form/task mapping rules.
+
+Single source of truth for the recommendation engine shared by the tasks
+router (/tasks/recommendations and /tasks/sync_from_questionnaire). Keeping
+the mapping tables and builders here prevents the router copies from
+drifting apart.
+"""
+
+import functools
+from typing import NamedTuple
+
+# ─── Mapping tables ───────────────────────────────────────────────────────────
+
+# income_source value → form codes that apply (frozensets: immutable, and
+# |= against them is a C-level set union with no intermediate allocation)
+INCOME_TO_FORMS: dict = {
+    "w2":          frozenset({"W-2"}),
+    "1099_nec":    frozenset({"1099-NEC", "Schedule C"}),
+    "1099_int":    frozenset({"1099-INT"}),
+    "1099_div":    frozenset({"1099-DIV"}),
+    "investments": frozenset({"1099-B", "Schedule D"}),
+    "1098_t":      frozenset({"1098-T"}),
+    "rental":      frozenset({"Schedule E"}),
+}
+
+_NO_FORMS: frozenset = frozenset()
+
+# Visa types that require Form 8843
+FORM_8843_VISAS = frozenset({"F-1", "F-2", "J-1", "J-2", "OPT", "STEM OPT"})
+
+# residency_status → primary return form
+RESIDENCY_TO_FORM: dict = {
+    "citizen":            "1040",
+    "permanent_resident": "1040",
+    "resident_alien":     "1040",
+    "nonresident_alien":  "1040-NR",
+    "dual_status":        "1040",   # also needs 1040-NR; add both
+    "unsure":             "1040",
+}
+
+
+# ─── Task templates ──────────────────────────────────────────────────────────
+# Static task rows, built once at import. build_tasks() iterates these tables
+# instead of running a per-source if-chain; the cached build shares these
+# dicts by reference and the public wrapper copies them on return.
+
+# income_source → "upload this form" task, emitted in this order when present
+INCOME_TASK_TEMPLATES: tuple = (
+    ("w2", {
+        "group": "Tax Forms",
+        "title": "Upload W-2 (Wage and Tax Statement)",
+        "description": "Reports wages paid and taxes withheld by your employer",
+        "form_code": "W-2",
+    }),
+    ("1099_nec", {
+        "group": "Tax Forms",
+        "title": "Upload 1099-NEC (Nonemployee Compensation)",
+        "description": "Reports freelance/self-employment income",
+        "form_code": "1099-NEC",
+    }),
+    ("1099_int", {
+        "group": "Tax Forms",
+        "title": "Upload 1099-INT (Interest Income)",
+        "description": "Reports interest earned from bank accounts",
+        "form_code": "1099-INT",
+    }),
+    ("1099_div", {
+        "group": "Tax Forms",
+        "title": "Upload 1099-DIV (Dividends and Distributions)",
+        "description": "Reports dividends from investments",
+        "form_code": "1099-DIV",
+    }),
+    ("investments", {
+        "group": "Tax Forms",
+        "title": "Upload 1099-B (Broker Transactions)",
+        "description": "Reports stock/crypto sale proceeds",
+        "form_code": "1099-B",
+    }),
+    ("1098_t", {
+        "group": "Tax Forms",
+        "title": "Upload 1098-T (Tuition Statement)",
+        "description": "Reports tuition paid for education credits (American Opportunity or Lifetime Learning)",
+        "form_code": "1098-T",
+    }),
+    ("rental", {
+        "group": "Tax Forms",
+        "title": "Upload Schedule E (Rental Income)",
+        "description": "Reports rental income and losses",
+        "form_code": "Schedule E",
+    }),
+)
+
+# income_source → follow-up task, emitted after the primary return form
+INCOME_FOLLOWUP_TEMPLATES: tuple = (
+    ("1099_nec", {
+        "group": "Work Forms",
+        "title": "Track business expenses for Schedule C",
+        "description": "Home office, equipment, software, mileage — reduces self-employment tax",
+        "form_code": "Schedule C",
+    }),
+    ("investments", {
+        "group": "Tax Forms",
+        "title": "Complete Schedule D (Capital Gains and Losses)",
+        "description": "Summary of investment gains/losses",
+        "form_code": "Schedule D",
+    }),
+)
+
+# primary return form → "complete your return" task
+RESIDENCY_TASK_TEMPLATES: dict = {
+    "1040": {
+        "group": "Tax Forms",
+        "title": "Complete Form 1040 (US Individual Income Tax Return)",
+        "description": "Main federal tax return for residents/citizens",
+        "form_code": "1040",
+    },
+    "1040-NR": {
+        "group": "Tax Forms",
+        "title": "Complete Form 1040-NR (Nonresident Alien Tax Return)",
+        "description": "Federal tax return for nonresident aliens",
+        "form_code": "1040-NR",
+    },
+}
+
+DUAL_STATUS_TASK: dict = {
+    "group": "Tax Forms",
+    "title": "Complete Form 1040-NR (Dual Status — Nonresident portion)",
+    "description": "Required in addition to 1040 for dual-status filers",
+    "form_code": "1040-NR",
+}
+
+# Unconditional / conditional static rows with no interpolated fields,
+# shared by reference inside the cached build.
+TASK_GATHER_ID: dict = {
+    "group": "Personal",
+    "title": "Gather personal identification",
+    "description": "SSN or ITIN, passport/visa, prior year tax return",
+}
+
+TASK_DETERMINE_RESIDENCY: dict = {
+    "group": "Personal",
+    "title": "Determine your tax residency status",
+    "description": "Apply the Substantial Presence Test to determine if you're a resident or nonresident alien",
+}
+
+
+# ─── Recommendation builders ─────────────────────────────────────────────────
+
+class DerivedProfile(NamedTuple):
+    """Hashable projection of the questionnaire fields the builders depend on.
+
+    Computed once per request by _derive() and shared by both builders, so the
+    q.get() lookups and the residency/visa/multi-state tests run once instead
+    of once per builder — and the tuple doubles as the lru_cache key.
+    """
+
+    filing_status: str | None
+    num_dependents: int
+    income_sources: tuple
+    residency: str
+    visa: str
+    states_worked: tuple
+    primary_form: str
+    visa_needs_8843: bool
+    is_dual_status: bool
+    is_multi_state: bool
+
+
+def _derive(q: dict) -> DerivedProfile:
+    """Project the questionnaire dict into a DerivedProfile."""
+    residency = q.get("residency_status", "unsure")
+    visa = q.get("visa_type", "")
+    states = tuple(q.get("states_worked") or ())
+    return DerivedProfile(
+        filing_status=q.get("filing_status"),
+        num_dependents=q.get("num_dependents", 0) or 0,
+        income_sources=tuple(sorted(q.get("income_sources") or ())),
+        residency=residency,
+        visa=visa,
+        states_worked=states,
+        primary_form=RESIDENCY_TO_FORM.get(residency, "1040"),
+        visa_needs_8843=visa in FORM_8843_VISAS,
+        is_dual_status=residency == "dual_status",
+        is_multi_state=len(states) > 1,
+    )
+
+
+def get_recommended_form_codes(q: dict) -> frozenset:
+    """Build the set of recommended form codes from questionnaire data.
+
+    Memoized like build_tasks: the result depends on a handful of
+    questionnaire fields, and the frozenset return is hashable so downstream
+    callers can use it as a cache key of their own.
+    """
+    return _recommended_codes_cached(_derive(q))
+
+
+@functools.lru_cache(maxsize=4096)
+def _recommended_codes_cached(d: DerivedProfile) -> frozenset:
+    # Primary return based on residency
+    recommended_codes = {d.primary_form}
+    if d.is_dual_status:
+        recommended_codes.add("1040-NR")
+
+    # Income-driven forms
+    for s in d.income_sources:
+        recommended_codes |= INCOME_TO_FORMS.get(s, _NO_FORMS)
+
+    # Visa-driven forms ("" is never in FORM_8843_VISAS, so no truthiness test)
+    if d.visa_needs_8843:
+        recommended_codes.add("Form 8843")
+
+    return frozenset(recommended_codes)
+
+
+def build_tasks(q: dict) -> list:
+    """Generate a recommended task list from questionnaire answers.
+
+    The heavy lifting is memoized on a projection of the questionnaire —
+    users hit /recommendations far more often than they edit their profile,
+    so repeat calls for an unchanged profile skip the build entirely. Each
+    call returns fresh top-level dicts, so callers may mutate the rows
+    without corrupting the cache or the shared templates.
+    """
+    return [dict(t) for t in _build_tasks_cached(_derive(q))]
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_tasks_cached(d: DerivedProfile) -> tuple:
+    tasks = []
+    # The sorted tuple on DerivedProfile is only a canonical cache key;
+    # emission walks the template tables so tasks keep the curated order
+    # (W-2 first), with an O(1) membership test per template.
+    src_set = frozenset(d.income_sources)
+
+    # Personal group
+    tasks.append(TASK_GATHER_ID)
+    tasks.append(
+        {
+            "group": "Personal",
+            "title": "Confirm your filing status",
+            "description": f"Currently set to: {d.filing_status or 'Not set'}",
+        }
+    )
+
+    if d.num_dependents > 0:
+        tasks.append(
+            {
+                "group": "Personal",
+                "title": "Gather dependent information",
+                "description": f"{d.num_dependents} dependent(s): SSN/ITIN, date of birth, relationship",
+            }
+        )
+
+    # Tax Forms group — one task per recommended form, in template order
+    tasks.extend(tmpl for src, tmpl in INCOME_TASK_TEMPLATES if src in src_set)
+
+    # Primary return form
+    tasks.append(RESIDENCY_TASK_TEMPLATES.get(d.primary_form, RESIDENCY_TASK_TEMPLATES["1040"]))
+
+    if d.is_dual_status:
+        tasks.append(DUAL_STATUS_TASK)
+
+    # Follow-up tasks (Schedule C expenses, Schedule D summary)
+    tasks.extend(tmpl for src, tmpl in INCOME_FOLLOWUP_TEMPLATES if src in src_set)
+
+    # Visa-specific
+    if d.visa_needs_8843:
+        tasks.append(
+            {
+                "group": "Tax Forms",
+                "title": f"Prepare Form 8843 ({d.visa} visa)",
+                "description": "Required for exempt individuals — must be filed even with zero income",
+                "form_code": "Form 8843",
+            }
+        )
+
+    # Multi-state
+    if d.is_multi_state:
+        tasks.append(
+            {
+                "group": "Other",
+                "title": f"File state returns for: {', '.join(d.states_worked)}",
+                "description": "You worked in multiple states — a separate state return may be required for each",
+            }
+        )
+
+    # Residency edge case
+    if d.residency == "unsure":
+        tasks.append(TASK_DETERMINE_RESIDENCY)
+
+    return tuple(tasks)
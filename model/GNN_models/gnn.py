@@ -112,14 +112,18 @@ class GNNModel(nn.Module):
             h = F.dropout(h, p=self.dropout, training=self.training)
         return h
 
-    def forward(
+    def forward_logits(
         self,
         user_x: torch.Tensor,
         edge_index: Optional[torch.Tensor] = None,
         ded_idx: Optional[torch.Tensor] = None,
     ) -> torch.Tensor:
         """
-        Forward pass.
+        Forward pass returning raw scores (pre-sigmoid).
+
+        Training pairs this with BCEWithLogitsLoss, whose fused
+        sigmoid + BCE kernel is more numerically stable at large logits
+        than sigmoid followed by BCELoss.
 
         Parameters
         ----------
@@ -132,8 +136,8 @@ class GNNModel(nn.Module):
 
         Returns
         -------
-        probs : Tensor (num_users, num_deductions)
-            Predicted probability for each (user, deduction) pair.
+        scores : Tensor (num_users, num_deductions)
+            Raw logit for each (user, deduction) pair.
         """
         user_emb = self.encode_users(user_x, edge_index)  # (N, H)
 
@@ -142,16 +146,78 @@ class GNNModel(nn.Module):
 
         ded_emb = self.ded_embeddings(ded_idx)  # (D, H)
 
-        num_users = user_emb.size(0)
-        num_deds = ded_emb.size(0)
+        # Bilinear scoring without materializing the (N·D, H) expansion:
+        # for out_features=1, score(i, j) = user_i @ W @ ded_j + b, so two
+        # matmuls give all N×D scores at once.
+        W = self.bilinear.weight.squeeze(0)  # (H, H)
+        return (user_emb @ W) @ ded_emb.T + self.bilinear.bias
 
-        # Expand for bilinear: (N, D, H) each
-        user_exp = user_emb.unsqueeze(1).expand(-1, num_deds, -1).reshape(-1, self.hidden_dim)
-        ded_exp = ded_emb.unsqueeze(0).expand(num_users, -1, -1).reshape(-1, self.hidden_dim)
+    def forward(
+        self,
+        user_x: torch.Tensor,
+        edge_index: Optional[torch.Tensor] = None,
+        ded_idx: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
+        """
+        Forward pass.
+
+        Same arguments as forward_logits; returns probabilities.
 
-        scores = self.bilinear(user_exp, ded_exp).reshape(num_users, num_deds)
-        probs = torch.sigmoid(scores)
-        return probs
+        Returns
+        -------
+        probs : Tensor (num_users, num_deductions)
+            Predicted probability for each (user, deduction) pair.
+        """
+        return torch.sigmoid(self.forward_logits(user_x, edge_index, ded_idx))
+
+    # ── Inference-time optimization ───────────────────────────────────────────
+
+    @torch.no_grad()
+    def fuse_batchnorms(self) -> None:
+        """Fold each BatchNorm1d into the preceding Linear/SAGEConv weights.
+
+        In eval mode BatchNorm1d is a fixed affine map, so it can be absorbed
+        into the previous layer's weight and bias — one fewer pass over the
+        hidden activations per encoder layer. Irreversible; inference only.
+        """
+        if self.training:
+            raise RuntimeError("fuse_batchnorms requires eval mode")
+
+        for i, norm in enumerate(self.norms):
+            if not isinstance(norm, nn.BatchNorm1d):
+                continue
+
+            conv = self.sage_layers[i] if i < len(self.sage_layers) else None
+            conv_lins = []
+            if conv is not None:
+                conv_lins = [
+                    lin for lin in (getattr(conv, "lin_l", None), getattr(conv, "lin_r", None))
+                    if lin is not None
+                ]
+                # The constant shift must land in some bias on the graph path
+                if not conv_lins or all(lin.bias is None for lin in conv_lins):
+                    continue
+
+            scale = norm.weight / torch.sqrt(norm.running_var + norm.eps)
+            shift = norm.bias - norm.running_mean * scale
+
+            # MLP path: BN(Wx + b) == (scale·W)x + (scale·b + shift)
+            mlp = self.mlp_layers[i]
+            mlp.weight.mul_(scale.unsqueeze(1))
+            mlp.bias.mul_(scale).add_(shift)
+
+            # Graph path: SAGEConv output is lin_l(aggr) + lin_r(x); scale
+            # both weights and absorb the shift into exactly one bias
+            shift_applied = False
+            for lin in conv_lins:
+                lin.weight.mul_(scale.unsqueeze(1))
+                if lin.bias is not None:
+                    lin.bias.mul_(scale)
+                    if not shift_applied:
+                        lin.bias.add_(shift)
+                        shift_applied = True
+
+            self.norms[i] = nn.Identity()
 
     # ── Persistence ───────────────────────────────────────────────────────────
 
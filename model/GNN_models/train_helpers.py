@@ -52,10 +52,21 @@ ENCODERS_DIR = Path(__file__).parent / "encoders"
 
 
 def load_csv(csv_path: str | None = None) -> pd.DataFrame:
-    """Load the synthetic users CSV."""
+    """Load the synthetic users dataset.
+
+    Prefers users.parquet when present (columnar, dictionary-encoded —
+    loading is bandwidth-bound instead of parse-bound); falls back to
+    users.csv. An explicit path is loaded by its extension.
+    """
     if csv_path is None:
-        csv_path = Path(__file__).parent.parent / "data" / "users.csv"
-    df = pd.read_csv(csv_path)
+        data_dir = Path(__file__).parent.parent / "data"
+        parquet_path = data_dir / "users.parquet"
+        csv_path = parquet_path if parquet_path.exists() else data_dir / "users.csv"
+    csv_path = Path(csv_path)
+    if csv_path.suffix == ".parquet":
+        df = pd.read_parquet(csv_path)
+    else:
+        df = pd.read_csv(csv_path)
     logger.info("Loaded %d rows from %s", len(df), csv_path)
     return df
 
@@ -101,10 +112,18 @@ def build_dataset(
     small: bool = False,
     csv_path: str | None = None,
     val_fraction: float = 0.15,
+    pin_memory: bool = False,
 ) -> dict:
     """
     Build complete dataset dictionary with train/val splits.
 
+    Parameters
+    ----------
+    pin_memory : bool
+        Pin the host tensors in page-locked memory so later
+        .to(device, non_blocking=True) copies can overlap with compute.
+        Ignored when CUDA is unavailable.
+
     Returns
     -------
     dict with keys:
@@ -127,11 +146,17 @@ def build_dataset(
         X, y, test_size=val_fraction, random_state=seed,
     )
 
-    return {
+    tensors = {
         "X_train": torch.tensor(X_train),
         "X_val": torch.tensor(X_val),
         "y_train": torch.tensor(y_train),
         "y_val": torch.tensor(y_val),
+    }
+    if pin_memory and torch.cuda.is_available():
+        tensors = {k: t.pin_memory() for k, t in tensors.items()}
+
+    return {
+        **tensors,
         "input_dim": X_train.shape[1],
         "deduction_names": DEDUCTIONS,
     }
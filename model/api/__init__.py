@@ -0,0 +1 @@
+"""FastAPI inference service for the LingoTax GNN deduction predictor."""
@@ -4,6 +4,8 @@ Smoke test: end-to-end training on a tiny dataset.
 Purpose:
     Run the full pipeline (generate data → train → checkpoint)
     on a small sample (500 rows) and verify artifacts are created.
+    Data generation runs in-process once per session; the CLI itself
+    is exercised by a single subprocess in test_generate_data.
 
 Run:
     pytest model/tests/test_train_smoke.py -v -s
@@ -17,23 +19,38 @@ import subprocess
 import sys
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "data"))
+
+from gen_synthetic import add_noise, assign_deduction_labels, generate_profiles
+
+
+@pytest.fixture(scope="session")
+def users_csv(tmp_path_factory):
+    """Generate the 500-row dataset once per session, in-process.
+
+    Calling the generator functions directly avoids a second interpreter
+    spawn (numpy + pandas import ~500ms each) for every test that needs
+    the data.
+    """
+    data_dir = tmp_path_factory.mktemp("data")
+    rng = np.random.default_rng(42)
+    df = generate_profiles(500, rng, distribution_aware=True)
+    df = assign_deduction_labels(df, rng)
+    df = add_noise(df, 0.05, rng)
+    csv_path = data_dir / "users.csv"
+    df.to_csv(csv_path, index=False)
+    return csv_path
 
 
 class TestTrainSmoke:
     """Smoke tests for the training pipeline."""
 
-    @pytest.fixture(autouse=True)
-    def setup_paths(self, tmp_path):
-        """Use a temporary directory for test outputs."""
-        self.output_dir = tmp_path / "models"
-        self.data_dir = tmp_path / "data"
-        self.data_dir.mkdir()
-
-    def test_generate_data(self):
+    def test_generate_data(self, tmp_path):
         """gen_synthetic.py --small should create users.csv and manifest.json."""
         result = subprocess.run(
             [
@@ -43,34 +60,22 @@ class TestTrainSmoke:
                 "--distribution-aware",
                 "--noise", "0.05",
                 "--seed", "42",
-                "--output-dir", str(self.data_dir),
+                "--output-dir", str(tmp_path),
             ],
             capture_output=True,
             text=True,
             timeout=30,
         )
         assert result.returncode == 0, f"gen_synthetic failed: {result.stderr}"
-        assert (self.data_dir / "users.csv").exists(), "users.csv not created"
-        assert (self.data_dir / "manifest.json").exists(), "manifest.json not created"
+        assert (tmp_path / "users.csv").exists(), "users.csv not created"
+        assert (tmp_path / "manifest.json").exists(), "manifest.json not created"
 
-    def test_train_smoke(self):
+    def test_train_smoke(self, users_csv, tmp_path):
         """Full training smoke run on 500 samples, 3 epochs."""
-        # Step 1: Generate data
-        data_result = subprocess.run(
-            [
-                sys.executable,
-                str(PROJECT_ROOT / "data" / "gen_synthetic.py"),
-                "--n", "500",
-                "--seed", "42",
-                "--output-dir", str(self.data_dir),
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30,
-        )
-        assert data_result.returncode == 0, f"Data gen failed: {data_result.stderr}"
+        output_dir = tmp_path / "models"
 
-        # Step 2: Train (must set PYTHONPATH so imports work)
+        # Train via the CLI (must set PYTHONPATH so imports work), reusing
+        # the session-scoped dataset instead of regenerating it
         env = os.environ.copy()
         env["PYTHONPATH"] = str(PROJECT_ROOT)
 
@@ -81,7 +86,8 @@ class TestTrainSmoke:
                 "--small",
                 "--epochs", "3",
                 "--seed", "42",
-                "--output-dir", str(self.output_dir),
+                "--csv", str(users_csv),
+                "--output-dir", str(output_dir),
             ],
             capture_output=True,
             text=True,
@@ -90,9 +96,9 @@ class TestTrainSmoke:
         )
         assert train_result.returncode == 0, f"Training failed: {train_result.stderr}"
 
-        # Step 3: Verify artifacts
-        ckpt_path = self.output_dir / "checkpoints" / "gnn_v1.pt"
-        meta_path = self.output_dir / "metadata" / "gnn_v1.json"
+        # Verify artifacts
+        ckpt_path = output_dir / "checkpoints" / "gnn_v1.pt"
+        meta_path = output_dir / "metadata" / "gnn_v1.json"
         assert ckpt_path.exists(), f"Checkpoint not found at {ckpt_path}"
         assert meta_path.exists(), f"Metadata not found at {meta_path}"
 
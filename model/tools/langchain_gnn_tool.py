@@ -17,20 +17,85 @@ Usage:
         agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
     )
 
+    # Async agents can fan out what-if analyses concurrently — the calls
+    # overlap on the wire instead of serializing on HTTP round-trips:
+    import asyncio
+
+    async def run_async(profiles):
+        return await asyncio.gather(
+            *(predict_deductions_tool_async.ainvoke(json.dumps(p)) for p in profiles)
+        )
+
 Author: LingoTax Team (HackAI 2026)
 """
 
+import asyncio
+import atexit
 import json
 import logging
 import os
 
+import httpx
 import requests
 from langchain.tools import tool
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
 GNN_API_URL = os.getenv("GNN_API_URL", "http://localhost:8001")
 
+# Persistent session for the sync tools: agents make bursts of tool calls,
+# and connection pooling + keep-alive saves a TCP/TLS handshake per call.
+# Transient gateway errors get two quick retries with backoff.
+_session = requests.Session()
+_session.headers["Connection"] = "keep-alive"
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504]),
+)
+_session.mount("http://", _adapter)
+_session.mount("https://", _adapter)
+
+# Shared AsyncClient for the async tool — created lazily on first use so
+# importing this module never opens connections, and reused for connection
+# pooling within an event loop. The pool binds to the loop that created it,
+# and sync scripts commonly drive the tool through repeated asyncio.run()
+# calls, so the client is rebuilt whenever the running loop changes or the
+# cached one is closed. No lock needed: the check-and-create below has no
+# await, so it cannot interleave within a single loop.
+_async_client: httpx.AsyncClient | None = None
+_async_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        if _async_client is not None and not _async_client.is_closed:
+            _dispose_async_client(_async_client, _async_client_loop)
+        _async_client = httpx.AsyncClient(timeout=10)
+        _async_client_loop = loop
+    return _async_client
+
+
+def _dispose_async_client(client: httpx.AsyncClient, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a client on the loop it belongs to; drop it if that loop is gone."""
+    if loop is not None and not loop.is_closed():
+        try:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        except RuntimeError:
+            pass
+    # Orphaned by a closed loop — nothing left to close its transports on
+
+
+@atexit.register
+def _close_async_client() -> None:
+    if _async_client is not None and not _async_client.is_closed:
+        _dispose_async_client(_async_client, _async_client_loop)
+
 
 @tool
 def predict_deductions_tool(user_json: str) -> str:
@@ -56,7 +121,7 @@ def predict_deductions_tool(user_json: str) -> str:
         return json.dumps({"error": f"Invalid JSON input: {e}"})
 
     try:
-        response = requests.post(
+        response = _session.post(
             f"{GNN_API_URL}/predict_deductions",
             json=user_data,
             timeout=10,
@@ -70,3 +135,77 @@ def predict_deductions_tool(user_json: str) -> str:
         return json.dumps({"error": f"GNN API returned error: {e.response.text}"})
     except Exception as e:
         return json.dumps({"error": f"Unexpected error calling GNN API: {e}"})
+
+
+@tool
+async def predict_deductions_tool_async(user_json: str) -> str:
+    """
+    Predict which US tax deductions a user likely qualifies for (async).
+
+    Same contract as predict_deductions_tool, but non-blocking: async
+    agents can gather many calls concurrently so the HTTP round-trips
+    overlap instead of serializing (see run_async in the module docstring).
+
+    Input: A JSON string with user profile fields:
+        visa_type, filing_status, num_dependents, total_income,
+        foreign_income, foreign_tax_paid, student_loan_interest_paid,
+        paid_tuition, owns_home, state, years_in_us.
+
+    Output: A JSON string with top_deductions (name, probability, rationale)
+            and all_probs for each of the 8 deduction categories.
+    """
+    try:
+        user_data = json.loads(user_json) if isinstance(user_json, str) else user_json
+    except json.JSONDecodeError as e:
+        return json.dumps({"error": f"Invalid JSON input: {e}"})
+
+    try:
+        client = _get_async_client()
+        response = await client.post(f"{GNN_API_URL}/predict_deductions", json=user_data)
+        response.raise_for_status()
+        return json.dumps(response.json(), indent=2)
+    except httpx.ConnectError:
+        return json.dumps({"error": "GNN API is not reachable. Ensure model server is running."})
+    except httpx.HTTPStatusError as e:
+        return json.dumps({"error": f"GNN API returned error: {e.response.text}"})
+    except Exception as e:
+        return json.dumps({"error": f"Unexpected error calling GNN API: {e}"})
+
+
+@tool
+def predict_deductions_batch_tool(users_json: str) -> str:
+    """
+    Predict tax deductions for MANY users in a single call.
+
+    Input: A JSON string containing an array of user profile objects, each
+           with the same fields as predict_deductions_tool.
+
+    Output: A JSON array with one result object per user (top_deductions
+            and all_probs), in input order.
+
+    Prefer this over repeated predict_deductions_tool calls when scoring
+    several profiles — the server runs one batched forward pass.
+    """
+    try:
+        users = json.loads(users_json) if isinstance(users_json, str) else users_json
+    except json.JSONDecodeError as e:
+        return json.dumps({"error": f"Invalid JSON input: {e}"})
+
+    if not isinstance(users, list):
+        return json.dumps({"error": "Input must be a JSON array of user profiles."})
+
+    try:
+        response = _session.post(
+            f"{GNN_API_URL}/predict_deductions_batch",
+            json={"users": users},
+            timeout=30,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return json.dumps(result, indent=2)
+    except requests.ConnectionError:
+        return json.dumps({"error": "GNN API is not reachable. Ensure model server is running."})
+    except requests.HTTPError as e:
+        return json.dumps({"error": f"GNN API returned error: {e.response.text}"})
+    except Exception as e:
+        return json.dumps({"error": f"Unexpected error calling GNN API: {e}"})
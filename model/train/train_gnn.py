@@ -24,6 +24,7 @@ from pathlib import Path
 import numpy as np
 import torch
 import torch.nn as nn
+from torch.utils.data import DataLoader, TensorDataset
 from sklearn.metrics import roc_auc_score, precision_score, recall_score
 
 # Add project root to path so imports work from any cwd
@@ -73,16 +74,30 @@ def train(args: argparse.Namespace) -> None:
         output_dir = Path(__file__).resolve().parent.parent / "models"
     else:
         output_dir = Path(args.output_dir)
-    dataset = build_dataset(seed=args.seed, small=args.small)
-    X_train = dataset["X_train"].to(device)
-    y_train = dataset["y_train"].to(device)
-    X_val = dataset["X_val"].to(device)
-    y_val = dataset["y_val"].to(device)
+    dataset = build_dataset(seed=args.seed, small=args.small, csv_path=args.csv,
+                            pin_memory=(device == "cuda"))
+    # Train tensors stay on CPU — the DataLoader moves one mini-batch at a
+    # time, so peak device memory is one batch, not the whole train split
+    X_train = dataset["X_train"]
+    y_train = dataset["y_train"]
+    X_val = dataset["X_val"].to(device, non_blocking=True)
+    y_val = dataset["y_val"].to(device, non_blocking=True)
     input_dim = dataset["input_dim"]
 
     logger.info("Train: %d samples, Val: %d samples, Features: %d",
                 X_train.shape[0], X_val.shape[0], input_dim)
 
+    train_ds = TensorDataset(X_train, y_train)
+    loader = DataLoader(
+        train_ds,
+        batch_size=args.batch_size,
+        shuffle=True,
+        pin_memory=(device == "cuda"),
+        # BatchNorm can't normalize a single row in training mode — drop a
+        # trailing batch only when it would have exactly one sample
+        drop_last=(len(train_ds) % args.batch_size == 1),
+    )
+
     # ── Model ─────────────────────────────────────────────────────────────────
     model = GNNModel(
         input_dim=input_dim,
@@ -92,15 +107,31 @@ def train(args: argparse.Namespace) -> None:
         dropout=0.3,
     ).to(device)
 
+    # Compile the logits forward when available — the linear+norm+activation
+    # stack fuses into far fewer kernels, and both training and validation
+    # forwards go through the same compiled callable. Skipped for --small
+    # smoke runs, where one-time compilation costs more than the run itself.
+    forward_logits = model.forward_logits
+    if not args.small:
+        try:
+            forward_logits = torch.compile(model.forward_logits, mode="reduce-overhead", fullgraph=False)
+        except Exception as exc:
+            logger.debug("torch.compile unavailable, running eager: %s", exc)
+
     optimizer = torch.optim.Adam(model.parameters(), lr=args.lr, weight_decay=1e-5)
-    criterion = nn.BCELoss()
+    # BCEWithLogitsLoss fuses sigmoid + BCE in one numerically stable kernel;
+    # the model's logits path skips the in-forward sigmoid entirely
+    criterion = nn.BCEWithLogitsLoss()
     scheduler = torch.optim.lr_scheduler.ReduceLROnPlateau(optimizer, patience=5, factor=0.5)
 
     # ── Training loop ─────────────────────────────────────────────────────────
     best_val_loss = float("inf")
     patience_counter = 0
     patience = 10
-    best_metrics = {}
+    best_val_probs = None
+    # One-time D2H copy of the ground truth; the epoch loop itself never
+    # moves tensors off the device
+    y_true = y_val.cpu().numpy()
 
     ckpt_dir = output_dir / "checkpoints"
     meta_dir = output_dir / "metadata"
@@ -112,36 +143,43 @@ def train(args: argparse.Namespace) -> None:
     t0 = time.time()
 
     for epoch in range(1, args.epochs + 1):
-        # Train
+        # Train — one gradient step per mini-batch, not per epoch
         model.train()
-        optimizer.zero_grad()
-        y_hat = model(X_train)
-        loss = criterion(y_hat, y_train)
-        loss.backward()
-        optimizer.step()
+        running_loss = 0.0
+        for xb, yb in loader:
+            # Pinned-host to device copies can overlap the previous batch's
+            # kernels; a no-op on CPU
+            xb = xb.to(device, non_blocking=True)
+            yb = yb.to(device, non_blocking=True)
+            # set_to_none skips the grad-buffer memset between steps
+            optimizer.zero_grad(set_to_none=True)
+            loss = criterion(forward_logits(xb), yb)
+            loss.backward()
+            optimizer.step()
+            running_loss += loss.item() * xb.size(0)
+        train_loss = running_loss / len(train_ds)
 
         # Validate
         model.eval()
         with torch.no_grad():
-            y_val_hat = model(X_val)
-            val_loss = criterion(y_val_hat, y_val).item()
+            val_logits = forward_logits(X_val)
+            val_loss = criterion(val_logits, y_val).item()
+            y_val_hat = torch.sigmoid(val_logits)
 
         scheduler.step(val_loss)
 
         if epoch % max(1, args.epochs // 10) == 0 or epoch == 1:
             logger.info("Epoch %3d/%d — train_loss=%.4f  val_loss=%.4f",
-                        epoch, args.epochs, loss.item(), val_loss)
+                        epoch, args.epochs, train_loss, val_loss)
 
         # Early stopping
         if val_loss < best_val_loss:
             best_val_loss = val_loss
             patience_counter = 0
 
-            # Compute metrics on best
-            y_prob = y_val_hat.cpu().numpy()
-            y_pred = (y_prob > 0.5).astype(int)
-            y_true = y_val.cpu().numpy()
-            best_metrics = compute_metrics(y_true, y_pred, y_prob)
+            # Snapshot the best predictions on-device — no sync or D2H copy
+            # per improving epoch; numpy conversion happens once post-loop
+            best_val_probs = y_val_hat.detach().clone()
 
             model.save_model(str(ckpt_path))
         else:
@@ -151,6 +189,31 @@ def train(args: argparse.Namespace) -> None:
                 break
 
     elapsed = time.time() - t0
+
+    best_metrics = {}
+    if best_val_probs is not None:
+        best_y_prob = best_val_probs.cpu().numpy()
+        y_pred = (best_y_prob > 0.5).astype(int)
+        best_metrics = compute_metrics(y_true, y_pred, best_y_prob)
+
+        # One-shot int8 sanity check: serving quantizes the FP32 checkpoint
+        # at load time (GNN_models.infer), so log what that costs in macro
+        # AUC on this val split. The int8 weights are not checkpointed —
+        # quantization is reapplied from gnn_v1.pt wherever it serves.
+        if device == "cpu":
+            try:
+                q_model = GNNModel.load_model(str(ckpt_path), device="cpu")
+                q_model = torch.ao.quantization.quantize_dynamic(
+                    q_model, {nn.Linear}, dtype=torch.qint8
+                )
+                with torch.no_grad():
+                    q_prob = q_model(X_val).cpu().numpy()
+                q_metrics = compute_metrics(y_true, (q_prob > 0.5).astype(int), q_prob)
+                logger.info("int8 dynamic quantization check: macro_auc %.4f (fp32) → %.4f (int8)",
+                            best_metrics.get("macro_auc", 0), q_metrics["macro_auc"])
+            except Exception as exc:  # pragma: no cover - depends on torch build
+                logger.debug("int8 quantization check skipped: %s", exc)
+
     logger.info("Training completed in %.1fs — best val_loss=%.4f, macro_auc=%.4f",
                 elapsed, best_val_loss, best_metrics.get("macro_auc", 0))
 
@@ -189,11 +252,13 @@ def train(args: argparse.Namespace) -> None:
 def main():
     parser = argparse.ArgumentParser(description="Train the GNN deduction predictor")
     parser.add_argument("--epochs", type=int, default=50)
-    parser.add_argument("--batch-size", type=int, default=256, help="(reserved for DataLoader)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Mini-batch size for the DataLoader")
     parser.add_argument("--lr", type=float, default=0.001)
     parser.add_argument("--hidden-dim", type=int, default=64)
     parser.add_argument("--gpu", action="store_true")
     parser.add_argument("--small", action="store_true", help="Smoke test on 500 samples")
+    parser.add_argument("--csv", type=str, default=None,
+                        help="Path to a pre-generated users dataset (default: model/data/users.csv)")
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--output-dir", type=str, default=None,
                         help="Directory for checkpoints and metadata (default: model/models/)")
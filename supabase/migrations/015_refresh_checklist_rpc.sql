@@ -0,0 +1,32 @@
+-- refresh_form_checklist: atomically replace a user's form checklist for a filing year.
+-- Called as RPC from the FastAPI backend:
+--   supabase.rpc("refresh_form_checklist", { p_user: "uuid", p_year: 2024, p_checklist: [{"form_id": "...", "status": "pending"}, ...] })
+--
+-- Replaces the previous DELETE round-trip + INSERT round-trip with one call,
+-- and makes the refresh transactional: a crash can no longer leave the user
+-- with an empty (half-refreshed) checklist.
+CREATE OR REPLACE FUNCTION refresh_form_checklist(
+  p_user      UUID,
+  p_year      INT,
+  p_checklist JSONB DEFAULT '[]'::jsonb
+)
+RETURNS INT
+LANGUAGE plpgsql
+SECURITY INVOKER
+AS $$
+DECLARE
+  inserted_count INT;
+BEGIN
+  DELETE FROM user_form_checklist
+  WHERE user_id = p_user
+    AND filing_year = p_year;
+
+  -- Set-oriented insert straight from the JSON payload
+  INSERT INTO user_form_checklist (user_id, form_id, filing_year, status)
+  SELECT p_user, r.form_id, p_year, COALESCE(r.status, 'pending')
+  FROM jsonb_to_recordset(p_checklist) AS r(form_id UUID, status TEXT);
+
+  GET DIAGNOSTICS inserted_count = ROW_COUNT;
+  RETURN inserted_count;
+END;
+$$;
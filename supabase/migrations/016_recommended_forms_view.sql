@@ -0,0 +1,101 @@
+-- Server-side form recommendation.
+--
+-- Mirrors the Python mapping tables in backend/services/tax_rules.py
+-- (INCOME_TO_FORMS, RESIDENCY_TO_FORM, FORM_8843_VISAS) as lookup tables and
+-- exposes v_user_recommended_forms, so recommended forms can be resolved in
+-- one query server-side instead of client-side set math + an IN filter.
+-- Keep the seeds below in sync with tax_rules.py.
+
+-- income_source → form codes
+CREATE TABLE IF NOT EXISTS ref_income_forms (
+  source    TEXT NOT NULL,
+  form_code TEXT NOT NULL,
+  PRIMARY KEY (source, form_code)
+);
+
+INSERT INTO ref_income_forms (source, form_code) VALUES
+  ('w2',          'W-2'),
+  ('1099_nec',    '1099-NEC'),
+  ('1099_nec',    'Schedule C'),
+  ('1099_int',    '1099-INT'),
+  ('1099_div',    '1099-DIV'),
+  ('investments', '1099-B'),
+  ('investments', 'Schedule D'),
+  ('1098_t',      '1098-T'),
+  ('rental',      'Schedule E')
+ON CONFLICT DO NOTHING;
+
+-- residency_status → primary return form(s); dual_status needs both returns
+CREATE TABLE IF NOT EXISTS ref_residency_forms (
+  status    TEXT NOT NULL,
+  form_code TEXT NOT NULL,
+  PRIMARY KEY (status, form_code)
+);
+
+INSERT INTO ref_residency_forms (status, form_code) VALUES
+  ('citizen',            '1040'),
+  ('permanent_resident', '1040'),
+  ('resident_alien',     '1040'),
+  ('nonresident_alien',  '1040-NR'),
+  ('dual_status',        '1040'),
+  ('dual_status',        '1040-NR'),
+  ('unsure',             '1040')
+ON CONFLICT DO NOTHING;
+
+-- Visa types that require Form 8843
+CREATE TABLE IF NOT EXISTS ref_form_8843_visas (
+  visa TEXT PRIMARY KEY
+);
+
+INSERT INTO ref_form_8843_visas (visa) VALUES
+  ('F-1'), ('F-2'), ('J-1'), ('J-2'), ('OPT'), ('STEM OPT')
+ON CONFLICT DO NOTHING;
+
+-- Global reference tables: anyone can read, nobody can write via PostgREST
+-- (same convention as task_groups/forms_catalog in 008_rls.sql — without RLS
+-- the default grants would leave these writable by any authenticated user).
+ALTER TABLE ref_income_forms ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "ref_income_forms_select_all" ON ref_income_forms
+  FOR SELECT USING (true);
+
+ALTER TABLE ref_residency_forms ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "ref_residency_forms_select_all" ON ref_residency_forms
+  FOR SELECT USING (true);
+
+ALTER TABLE ref_form_8843_visas ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "ref_form_8843_visas_select_all" ON ref_form_8843_visas
+  FOR SELECT USING (true);
+
+-- One row per (user, filing_year, recommended form), joined to forms_catalog.
+-- security_invoker so the questionnaires RLS policy applies to the caller.
+CREATE OR REPLACE VIEW v_user_recommended_forms AS
+WITH codes AS (
+  SELECT q.user_id, q.filing_year, rif.form_code
+  FROM questionnaires q
+  CROSS JOIN LATERAL unnest(q.income_sources) AS s(source)
+  JOIN ref_income_forms rif ON rif.source = s.source
+
+  UNION
+
+  SELECT q.user_id, q.filing_year, rrf.form_code
+  FROM questionnaires q
+  JOIN ref_residency_forms rrf
+    ON rrf.status = COALESCE(q.residency_status, 'unsure')
+
+  UNION
+
+  SELECT q.user_id, q.filing_year, 'Form 8843'
+  FROM questionnaires q
+  JOIN ref_form_8843_visas v ON v.visa = q.visa_type
+)
+SELECT
+  c.user_id,
+  c.filing_year,
+  f.id AS form_id,
+  f.form_code,
+  f.display_name,
+  f.description
+FROM codes c
+JOIN forms_catalog f ON f.form_code = c.form_code;
+
+ALTER VIEW v_user_recommended_forms SET (security_invoker = true);
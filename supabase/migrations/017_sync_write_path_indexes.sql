@@ -0,0 +1,19 @@
+-- Composite indexes for the questionnaire-sync write paths.
+--
+-- sync_tasks_from_questionnaire filters tasks by (user_id, filing_year,
+-- source) for the existing-tasks read and the obsolete-task delete, and
+-- refresh_form_checklist (migration 015) deletes user_form_checklist rows by
+-- (user_id, filing_year). Without covering composites these are filtered
+-- scans of each user's rows. user_id leads every index so the RLS predicate
+-- (user_id = auth.uid()) is satisfied from the index too.
+--
+-- questionnaires (user_id, filing_year) is already UNIQUE from migration 003.
+
+CREATE INDEX IF NOT EXISTS idx_tasks_user_year_source
+  ON tasks (user_id, filing_year, source);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_user_year_auto
+  ON tasks (user_id, filing_year, auto_generated);
+
+CREATE INDEX IF NOT EXISTS idx_user_form_checklist_user_year
+  ON user_form_checklist (user_id, filing_year);
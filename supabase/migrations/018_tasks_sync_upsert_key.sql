@@ -0,0 +1,13 @@
+-- Unique key for the questionnaire-sync task upsert.
+--
+-- sync_tasks_from_questionnaire identifies tasks by (user, year, group,
+-- title); a unique index on that key lets the router replace its per-task
+-- UPDATE/INSERT loop with a single batched upsert (PostgREST on_conflict).
+--
+-- Deliberately not a partial index (WHERE source = 'questionnaire'):
+-- PostgREST's on_conflict parameter can only target full unique
+-- constraints/indexes. Duplicate titles within one group+year were never
+-- meaningful, so enforcing the key across manual tasks too is acceptable.
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_tasks_user_year_group_title
+  ON tasks (user_id, filing_year, task_group_id, title);
@@ -0,0 +1,60 @@
+-- One-round-trip read path for GET /tasks/recommendations.
+--
+-- The router previously probed for the questionnaire, fetched it, and then
+-- resolved recommended forms from the catalog — multiple PostgREST calls.
+-- This RPC returns the questionnaire projection and the recommended forms
+-- (via v_user_recommended_forms from migration 016) as one JSONB payload,
+-- or NULL when no questionnaire exists for the year.
+
+CREATE OR REPLACE FUNCTION get_recommendations_payload(p_user UUID, p_year INT)
+RETURNS JSONB
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+  v_questionnaire JSONB;
+  v_forms JSONB;
+BEGIN
+  SELECT jsonb_build_object(
+    'id',               q.id,
+    'residency_status', q.residency_status,
+    'income_sources',   to_jsonb(q.income_sources),
+    'visa_type',        q.visa_type,
+    'states_worked',    to_jsonb(q.states_worked),
+    'filing_status',    q.filing_status,
+    'num_dependents',   q.num_dependents,
+    'filing_year',      q.filing_year
+  )
+  INTO v_questionnaire
+  FROM questionnaires q
+  WHERE q.user_id = p_user
+    AND q.filing_year = p_year;
+
+  IF v_questionnaire IS NULL THEN
+    RETURN NULL;
+  END IF;
+
+  SELECT COALESCE(
+    jsonb_agg(
+      jsonb_build_object(
+        'id',           v.form_id,
+        'form_code',    v.form_code,
+        'display_name', v.display_name,
+        'description',  v.description
+      )
+    ),
+    '[]'::jsonb
+  )
+  INTO v_forms
+  FROM v_user_recommended_forms v
+  WHERE v.user_id = p_user
+    AND v.filing_year = p_year;
+
+  RETURN jsonb_build_object(
+    'questionnaire',     v_questionnaire,
+    'recommended_forms', v_forms
+  );
+END;
+$$;
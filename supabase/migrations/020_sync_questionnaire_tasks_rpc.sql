@@ -0,0 +1,71 @@
+-- Whole-diff task sync in one statement.
+--
+-- sync_tasks_from_questionnaire previously read the existing auto-generated
+-- tasks, upserted the recommended rows, and deleted the leftovers — three
+-- round-trips plus Python-side set math. This RPC takes the recommended rows
+-- as JSONB, upserts them on the migration-018 unique key, deletes the
+-- questionnaire tasks that were not re-recommended, and derives the counts
+-- server-side (xmax = 0 distinguishes fresh inserts from updates). Inserts
+-- take the status column default and conflicts leave status untouched, so
+-- user progress survives re-syncs.
+
+CREATE OR REPLACE FUNCTION sync_questionnaire_tasks(p_user UUID, p_year INT, p_rows JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+SECURITY INVOKER
+SET search_path = public
+AS $$
+DECLARE
+  v_created INT;
+  v_updated INT;
+  v_deleted INT;
+BEGIN
+  WITH incoming AS (
+    SELECT r.task_group_id, r.title, r.description, r.form_code,
+           r.sort_order, r.questionnaire_id
+    FROM jsonb_to_recordset(p_rows)
+      AS r(task_group_id UUID, title TEXT, description TEXT, form_code TEXT,
+           sort_order INT, questionnaire_id UUID)
+  ),
+  upserted AS (
+    INSERT INTO tasks (user_id, task_group_id, title, description, form_code,
+                       filing_year, sort_order, questionnaire_id,
+                       auto_generated, source)
+    SELECT p_user, i.task_group_id, i.title, i.description, i.form_code,
+           p_year, i.sort_order, i.questionnaire_id, TRUE, 'questionnaire'
+    FROM incoming i
+    ON CONFLICT (user_id, filing_year, task_group_id, title) DO UPDATE
+      SET description      = EXCLUDED.description,
+          form_code        = EXCLUDED.form_code,
+          sort_order       = EXCLUDED.sort_order,
+          questionnaire_id = EXCLUDED.questionnaire_id,
+          auto_generated   = TRUE,
+          source           = 'questionnaire'
+    RETURNING task_group_id, title, (xmax = 0) AS inserted
+  ),
+  removed AS (
+    DELETE FROM tasks t
+    WHERE t.user_id = p_user
+      AND t.filing_year = p_year
+      AND t.source = 'questionnaire'
+      AND NOT EXISTS (
+        SELECT 1
+        FROM upserted u
+        WHERE u.task_group_id = t.task_group_id
+          AND u.title = t.title
+      )
+    RETURNING t.id
+  )
+  SELECT
+    (SELECT COUNT(*) FROM upserted WHERE inserted),
+    (SELECT COUNT(*) FROM upserted WHERE NOT inserted),
+    (SELECT COUNT(*) FROM removed)
+  INTO v_created, v_updated, v_deleted;
+
+  RETURN jsonb_build_object(
+    'created', COALESCE(v_created, 0),
+    'updated', COALESCE(v_updated, 0),
+    'deleted', COALESCE(v_deleted, 0)
+  );
+END;
+$$;